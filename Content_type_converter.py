@@ -1,128 +1,180 @@
 import sys
+import functools
+import io
 import json
-from urllib.parse import urlencode, parse_qs, unquote_plus
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
 import re
+from typing import Union
+from urllib.parse import urlencode, parse_qsl, unquote_plus
+import xml.etree.ElementTree as ET
 
-# --- Conversion Helper Functions ---
+# Tree-walking helpers, compiled with mypyc when a build is present
+from _converters import _flatten_form_pairs, _xml_to_dict_iter, _dict_to_xml_events, _check_tag
 
-def _flatten_dict_for_form(d, parent_key=''):
-    """
-    Recursively flattens a nested dictionary to prepare it for form URL encoding.
-    Handles nested objects and lists.
-    Example: {'user': {'name': 'test'}} -> {'user[name]': 'test'}
-    """
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}[{k}]" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(_flatten_dict_for_form(v, new_key).items())
-        elif isinstance(v, list):
-            for i, item in enumerate(v):
-                if isinstance(item, dict):
-                    items.extend(_flatten_dict_for_form(item, f"{new_key}[{i}]").items())
-                else:
-                    items.append((f"{new_key}[{i}]", item))
-        else:
-            items.append((new_key, v))
-    return dict(items)
+# Prefer orjson when it is installed, fall back to the standard library
+try:
+    import orjson
 
-def _xml_to_dict_recursive(node):
-    """
-    Recursively converts an XML element and its children into a dictionary.
-    Handles simple text, children, and lists of same-tagged children.
-    """
-    result = {}
-    if node.text and node.text.strip():
-        # If the node has text and no children, it's a simple value
-        if not list(node):
-            return node.text.strip()
-
-    for child in node:
-        child_data = _xml_to_dict_recursive(child)
-        # Sanitize tag name (remove namespace)
-        tag = re.sub(r'\{.*\}', '', child.tag)
-
-        if tag in result:
-            # If key already exists, convert it to a list
-            if not isinstance(result[tag], list):
-                result[tag] = [result[tag]]
-            result[tag].append(child_data)
-        else:
-            result[tag] = child_data
-    return result
+    _HAVE_ORJSON = True
+except ImportError:
+    _HAVE_ORJSON = False
 
-def _dict_to_xml_recursive(data, root_element):
+# orjson silently turns integers outside the 64-bit range into floats, bodies with
+# 19+ digit runs (int64 min/max have 19) go to the exact stdlib parser instead
+_LONG_INT_RE = re.compile(r'\d{19,}')
+_LONG_INT_BYTES_RE = re.compile(rb'\d{19,}')
+
+class _NonFiniteFloat(float):
     """
-    Recursively builds an XML tree from a dictionary.
+    NaN/Infinity parsed by the stdlib fallback. orjson can't serialize float
+    subclasses, so these send _json_dumps_pretty to stdlib json, which keeps
+    them as NaN/Infinity instead of orjson's null.
     """
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if isinstance(value, list):
-                for item in value:
-                    sub_element = ET.SubElement(root_element, key)
-                    _dict_to_xml_recursive(item, sub_element)
-            else:
-                sub_element = ET.SubElement(root_element, key)
-                _dict_to_xml_recursive(value, sub_element)
-    else:
-        # Convert non-string values to string for XML
-        root_element.text = str(data)
 
-# --- Parsers (Input String -> Python Dictionary) ---
+def _json_loads(s):
+    """Parses JSON with orjson where that is lossless, stdlib json otherwise."""
+    if _HAVE_ORJSON:
+        long_int_re = _LONG_INT_BYTES_RE if isinstance(s, bytes) else _LONG_INT_RE
+        if long_int_re.search(s) is None:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # orjson rejects NaN/Infinity, which stdlib json accepts
+                pass
+    return json.loads(s, parse_constant=_NonFiniteFloat)
+
+def _json_dumps_pretty(data):
+    """Formats data as JSON indented by two spaces, with orjson when possible."""
+    if _HAVE_ORJSON:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+        except TypeError:
+            # Integers outside the 64-bit range or _NonFiniteFloat values
+            pass
+    return json.dumps(data, indent=2)
+
+# Use lxml for XML when it is installed, ElementTree otherwise
+try:
+    from lxml import etree as LET  # type: ignore[import-untyped]
+
+    # resolve_entities='internal' needs lxml 5, older versions would treat it
+    # as True and also load external entities
+    _HAVE_LXML = LET.LXML_VERSION >= (5,)
+except ImportError:
+    _HAVE_LXML = False
+
+if _HAVE_LXML:
+    # Untrusted input: expand only entities declared in the document itself
+    # (like ElementTree does), never external ones, and don't touch the network
+    _LXML_PARSER = LET.XMLParser(resolve_entities='internal', no_network=True,
+                                 remove_comments=True, remove_pis=True)
+    # For str input re-encoded as UTF-8, ignoring the encoding declaration
+    _LXML_TEXT_PARSER = LET.XMLParser(resolve_entities='internal', no_network=True,
+                                      remove_comments=True, remove_pis=True,
+                                      encoding='utf-8')
+
+# --- Conversion Helper Functions ---
+
+def _to_text(body):
+    """Decodes a UTF-8 body to str, leaving str input untouched."""
+    if isinstance(body, bytes):
+        return body.decode('utf-8')
+    return body
+
+# --- Parsers (Input Bytes/String -> Python Dictionary) ---
 
-def parse_json_to_dict(body: str) -> dict:
-    """Parses a JSON string into a dictionary."""
+def parse_json_to_dict(body: Union[bytes, str]) -> dict:
+    """Parses a JSON body (bytes or str) into a dictionary."""
     try:
-        return json.loads(body)
-    except json.JSONDecodeError as e:
+        return _json_loads(body)
+    except ValueError as e:
         raise ValueError(f"Invalid JSON format: {e}")
 
-def parse_form_to_dict(body: str) -> dict:
-    """Parses a form-urlencoded string into a dictionary."""
-    # parse_qs returns lists for all values, so we simplify them
-    parsed = parse_qs(body)
-    return {k: v[0] if len(v) == 1 else v for k, v in parsed.items()}
+def parse_form_to_dict(body: Union[bytes, str]) -> dict:
+    """Parses a form-urlencoded body (bytes or str) into a dictionary."""
+    # Single values stay scalars, only repeated keys become lists
+    result: dict = {}
+    for k, v in parse_qsl(_to_text(body), keep_blank_values=True):
+        if k in result:
+            current = result[k]
+            if isinstance(current, list):
+                current.append(v)
+            else:
+                result[k] = [current, v]
+        else:
+            result[k] = v
+    return result
+
+def parse_xml_to_dict(body: Union[bytes, str]) -> dict:
+    """Parses an XML body (bytes or str) into a dictionary."""
+    if _HAVE_LXML:
+        if isinstance(body, str):
+            # lxml refuses str input that carries an encoding declaration,
+            # and the declared encoding no longer applies once re-encoded
+            data, parser = body.encode('utf-8'), _LXML_TEXT_PARSER
+        else:
+            data, parser = body, _LXML_PARSER
+        try:
+            root = LET.fromstring(data, parser)
+            return {root.tag.rpartition('}')[2]: _xml_to_dict_iter(root)}
+        except LET.XMLSyntaxError as e:
+            # libxml2 refuses documents nested deeper than 256 levels, let
+            # ElementTree handle those rather than enabling huge_tree
+            if e.code != LET.ErrorTypes.ERR_RESOURCE_LIMIT:
+                raise ValueError(f"Invalid XML format: {e}")
 
-def parse_xml_to_dict(body: str) -> dict:
-    """Parses an XML string into a dictionary."""
     try:
         root = ET.fromstring(body)
-        return {re.sub(r'\{.*\}', '', root.tag): _xml_to_dict_recursive(root)}
+        return {root.tag.rpartition('}')[2]: _xml_to_dict_iter(root)}
     except ET.ParseError as e:
         raise ValueError(f"Invalid XML format: {e}")
 
-def parse_plain_to_dict(body: str) -> dict:
+def parse_plain_to_dict(body: Union[bytes, str]) -> dict:
     """Wraps plain text in a dictionary."""
-    return {"text": body}
+    return {"text": _to_text(body)}
 
 # --- Formatters (Python Dictionary -> Output String) ---
 
 def format_dict_to_json(data: dict) -> str:
     """Formats a dictionary into a pretty-printed JSON string."""
-    return json.dumps(data, indent=2)
+    return _json_dumps_pretty(data)
 
 def format_dict_to_form(data: dict) -> str:
     """Formats a dictionary into a form-urlencoded string."""
     if not isinstance(data, dict):
         raise TypeError("Form conversion requires dictionary input.")
-    flattened_data = _flatten_dict_for_form(data)
-    return urlencode(flattened_data)
+    return urlencode(list(_flatten_form_pairs(data)))
 
 def format_dict_to_xml(data: dict) -> str:
     """Formats a dictionary into a pretty-printed XML string."""
     if not isinstance(data, dict) or len(data) != 1:
         raise TypeError("XML conversion requires a dictionary with a single root key.")
     
-    root_key = list(data.keys())[0]
-    root = ET.Element(root_key)
-    _dict_to_xml_recursive(data[root_key], root)
-    
-    # Pretty-print the XML
-    rough_string = ET.tostring(root, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ")
+    root_key = next(iter(data))
+    root_val = data[root_key]
+    _check_tag(root_key)
+
+    # Stream the dict into a TreeBuilder rather than building it with SubElement
+    builder = LET.TreeBuilder() if _HAVE_LXML else ET.TreeBuilder()
+    builder.start(root_key, {})
+    _dict_to_xml_events(root_val, builder)
+    builder.end(root_key)
+    root = builder.close()
+
+    if _HAVE_LXML:
+        # lxml indents while serializing, in C
+        return '<?xml version="1.0" ?>\n' + LET.tostring(root, pretty_print=True, encoding='unicode')
+
+    # Pretty-print the XML in place, no need to reparse it
+    ET.indent(root, space="  ")
+
+    # Serialize straight into one buffer, declaration included
+    buf = io.StringIO()
+    buf.write('<?xml version="1.0" ?>\n')
+    ET.ElementTree(root).write(buf, encoding='unicode')
+    buf.write('\n')
+    # ElementTree writes empty elements as "<x />", lxml as "<x/>". Text has
+    # ">" escaped and there are no attributes, so " />" only ends empty tags
+    return buf.getvalue().replace(' />', '/>')
 
 def format_dict_to_plain(data: dict) -> str:
     """
@@ -132,7 +184,7 @@ def format_dict_to_plain(data: dict) -> str:
     """
     if isinstance(data, dict) and 'text' in data:
         return str(data['text'])
-    return json.dumps(data, indent=2)
+    return _json_dumps_pretty(data)
 
 # --- Core Logic ---
 
@@ -143,33 +195,57 @@ SUPPORTED_TYPES = {
     "plain": ("text/plain", parse_plain_to_dict, format_dict_to_plain),
 }
 
-def extract_body_from_request(raw_request: str) -> str:
-    """Finds and returns the body from a raw HTTP request string."""
+# Maps both the short names and the full MIME types to a SUPPORTED_TYPES key
+_ALIASES = {key: key for key in SUPPORTED_TYPES}
+_ALIASES.update({mime: key for key, (mime, _, _) in SUPPORTED_TYPES.items()})
+_ALIASES["application/xml"] = "xml"
+
+# Joined once, reused by error messages and the interactive prompts
+_SUPPORTED_KEYS_LIST = ', '.join(SUPPORTED_TYPES)
+
+def extract_body_from_request(raw_request: bytes) -> bytes:
+    """Finds and returns the body from raw HTTP request bytes."""
     # Find the end of headers, marked by a double newline
-    parts = raw_request.split("\r\n\r\n", 1)
-    if len(parts) == 2:
-        return parts[1]
-    
+    idx = raw_request.find(b"\r\n\r\n")
+    if idx >= 0:
+        return raw_request[idx + 4:]
+
     # Fallback for LF line endings
-    parts_lf = raw_request.split("\n\n", 1)
-    if len(parts_lf) == 2:
-        return parts_lf[1]
-        
+    idx = raw_request.find(b"\n\n")
+    if idx >= 0:
+        return raw_request[idx + 2:]
+
     # If no separator is found, assume the whole input is the body
     return raw_request
 
-def convert_body(body: str, source_type: str, target_type: str) -> tuple[str, str]:
+def convert_body(body: Union[bytes, str], source_type: str, target_type: str) -> tuple[str, str]:
     """
-    Converts a request body from a source content type to a target one.
+    Converts a request body (bytes or str) from a source content type to a target one.
     Returns a tuple containing the converted body and the new Content-Type header.
+    Results are cached, call cache_clear() to drop them.
     """
-    source_type = source_type.lower().strip()
-    target_type = target_type.lower().strip()
+    src = _ALIASES.get(source_type.strip().lower())
+    if src is None:
+        raise ValueError(f"Unsupported source type: '{source_type.strip()}'. Supported types are: {_SUPPORTED_KEYS_LIST}")
+    dst = _ALIASES.get(target_type.strip().lower())
+    if dst is None:
+        raise ValueError(f"Unsupported target type: '{target_type.strip()}'. Supported types are: {_SUPPORTED_KEYS_LIST}")
 
-    if source_type not in SUPPORTED_TYPES:
-        raise ValueError(f"Unsupported source type: '{source_type}'. Supported types are: {', '.join(SUPPORTED_TYPES.keys())}")
-    if target_type not in SUPPORTED_TYPES:
-        raise ValueError(f"Unsupported target type: '{target_type}'. Supported types are: {', '.join(SUPPORTED_TYPES.keys())}")
+    return _convert_cached(body, src, dst)
+
+@functools.lru_cache(maxsize=256)
+def _convert_cached(body: Union[bytes, str], source_type: str, target_type: str) -> tuple[str, str]:
+    """
+    Does the actual conversion for convert_body, with already resolved type keys.
+    Memoized, so replaying the same body skips parsing and formatting.
+    """
+    # Nothing to convert, hand the body back as it is
+    if source_type == target_type:
+        return _to_text(body), f"Content-Type: {SUPPORTED_TYPES[source_type][0]}"
+
+    # Plain text to JSON is just the wrapped text, serialize it directly
+    if source_type == 'plain' and target_type == 'json':
+        return _json_dumps_pretty({"text": _to_text(body)}), f"Content-Type: {SUPPORTED_TYPES['json'][0]}"
 
     # Step 1: Parse the source body into a common intermediate format (dict)
     _, parser, _ = SUPPORTED_TYPES[source_type]
@@ -181,6 +257,10 @@ def convert_body(body: str, source_type: str, target_type: str) -> tuple[str, st
 
     return converted_body, f"Content-Type: {target_header}"
 
+# Let callers drop or inspect the memoized conversions
+cache_clear = _convert_cached.cache_clear
+cache_info = _convert_cached.cache_info
+
 # --- UI/CLI Functions ---
 
 def print_help():
@@ -208,7 +288,7 @@ USAGE:
     python content_type_converter.py --help
     python content_type_converter.py --helpme
 
-SUPPORTED CONTENT TYPES (use short names):
+SUPPORTED CONTENT TYPES (short names or full MIME types):
   - json:  application/json
   - form:  application/x-www-form-urlencoded
   - xml:   application/xml
@@ -225,7 +305,7 @@ def run_interactive_mode():
     print("Paste your full HTTP request below. Press Ctrl+D (Linux/Mac) or Ctrl+Z then Enter (Windows) when done.")
     
     try:
-        raw_request = sys.stdin.read()
+        raw_request = sys.stdin.buffer.read()
         if not raw_request.strip():
             print("\nNo input received. Exiting.")
             return
@@ -237,11 +317,11 @@ def run_interactive_mode():
             return
             
         print("\n--- Extracted Body ---")
-        print(body)
+        print(body.decode('utf-8', errors='replace'))
         print("----------------------")
 
-        source_type = input(f"Enter source content type ({', '.join(SUPPORTED_TYPES.keys())}): ").strip("'\" ")
-        target_type = input(f"Enter target content type ({', '.join(SUPPORTED_TYPES.keys())}): ").strip("'\" ")
+        source_type = input(f"Enter source content type ({_SUPPORTED_KEYS_LIST}): ").strip("'\" ")
+        target_type = input(f"Enter target content type ({_SUPPORTED_KEYS_LIST}): ").strip("'\" ")
 
         converted_body, new_header = convert_body(body, source_type, target_type)
         
@@ -261,7 +341,7 @@ def run_interactive_mode():
 def run_file_mode(filepath: str, source_type: str, target_type: str):
     """Handles the file-based conversion."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
+        with open(filepath, 'rb') as f:
             raw_request = f.read()
         
         body = extract_body_from_request(raw_request).strip()
@@ -0,0 +1,114 @@
+"""
+Tree-walking helpers used by Content_type_converter.py.
+
+Kept in their own, fully annotated module so they can optionally be
+compiled with mypyc (`mypyc _converters.py`). The compiled extension is
+picked up automatically by the import system, otherwise this pure-Python
+file is used.
+"""
+import re
+from typing import Any, Iterator, Union
+
+# An XML element name, optionally in ElementTree's '{namespace}name' form
+_TAG_RE = re.compile(r'(?:\{[^}]*\})?[^\W\d][\w.\-\u00b7]*')
+
+def _flatten_form_pairs(d: dict) -> Iterator[tuple[str, Any]]:
+    """
+    Flattens a nested dictionary into (key, value) pairs for form URL encoding.
+    Handles nested objects and lists, using an explicit stack instead of
+    recursion, and yields pairs in document order.
+    Example: {'user': {'name': 'test'}} -> ('user[name]', 'test')
+    """
+    # Key segments of the current path, e.g. ['user', '[name]'], joined
+    # only once per leaf instead of rebuilding the prefix at every level
+    parts: list[str] = []
+    stack: list[tuple[Any, Any, int]] = [(k, v, 0) for k, v in d.items()]
+    stack.reverse()
+    while stack:
+        k, v, depth = stack.pop()
+        del parts[depth:]
+        parts.append(f"[{k}]" if depth else str(k))
+        if isinstance(v, dict):
+            children = [(ck, cv, depth + 1) for ck, cv in v.items()]
+        elif isinstance(v, list):
+            children = [(i, item, depth + 1) for i, item in enumerate(v)]
+        else:
+            yield (''.join(parts), v)
+            continue
+        # Pushed in reverse so they pop off in document order
+        children.reverse()
+        stack.extend(children)
+
+def _xml_to_dict_iter(root: Any) -> Union[dict, str]:
+    """
+    Converts an XML element and its children into a dictionary.
+    Handles simple text, children, and lists of same-tagged children.
+    Walks the tree with an explicit stack, so deep documents don't hit
+    the recursion limit.
+    """
+    text = root.text
+    if text and text.strip() and not len(root):
+        # If the node has text and no children, it's a simple value
+        return text.strip()
+
+    result: dict = {}
+    stack: list[tuple[dict, Iterator[Any]]] = [(result, iter(root))]
+    while stack:
+        parent_result, children = stack[-1]
+        for child in children:
+            raw_tag = child.tag
+            if not isinstance(raw_tag, str):
+                # Not an element (e.g. an lxml entity node), skip it
+                continue
+            # Sanitize tag name (remove namespace)
+            tag = raw_tag.rpartition('}')[2]
+
+            text = child.text
+            child_data: Any
+            if not len(child):
+                child_data = text.strip() if text and text.strip() else {}
+            else:
+                # Filled in once we descend into the child below
+                child_data = {}
+
+            if tag in parent_result:
+                # If key already exists, convert it to a list
+                if not isinstance(parent_result[tag], list):
+                    parent_result[tag] = [parent_result[tag]]
+                parent_result[tag].append(child_data)
+            else:
+                parent_result[tag] = child_data
+
+            if len(child):
+                stack.append((child_data, iter(child)))
+                break
+        else:
+            # All children of this node are done
+            stack.pop()
+    return result
+
+def _check_tag(key: Any) -> None:
+    """Raises ValueError if `key` can't be used as an XML element name."""
+    if not isinstance(key, str) or _TAG_RE.fullmatch(key) is None:
+        raise ValueError(f"Invalid XML tag name: {key!r}")
+
+def _dict_to_xml_events(data: Any, builder: Any) -> None:
+    """
+    Recursively feeds a dictionary into an XML TreeBuilder as start/data/end
+    events. Works with both ElementTree's and lxml's TreeBuilder.
+    """
+    if isinstance(data, dict):
+        for key, value in data.items():
+            _check_tag(key)
+            # A list becomes one element per item, all with the same tag
+            items: Any = value if isinstance(value, list) else (value,)
+            for item in items:
+                builder.start(key, {})
+                _dict_to_xml_events(item, builder)
+                builder.end(key)
+    else:
+        # Convert non-string values to string for XML. An empty string is
+        # left out so lxml writes "<x/>" rather than "<x></x>"
+        text = str(data)
+        if text:
+            builder.data(text)